@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
-import base64
+import json
 
 
 # ----------------------------------
@@ -10,14 +13,16 @@ import base64
 # ----------------------------------
 
 
-def get_base64_image(image_path: str) -> str:
-    """Return a base64 data URI for an image file."""
-    img_path = Path(__file__).resolve().parent / image_path
-    if not img_path.exists():
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+def static_url(filename: str) -> str:
+    """
+    URL for a file in static/ next to app.py (served via server.enableStaticServing),
+    or "" if the file is missing. The browser caches it instead of us inlining base64.
+    """
+    if not (STATIC_DIR / filename).exists():
         return ""
-    with open(img_path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
-    return f"data:image/png;base64,{b64}"
+    return f"./app/static/{filename}"
 
 st.set_page_config(page_title="FantasyLine", page_icon="🏈", layout="wide")
 
@@ -26,27 +31,165 @@ CSV_FILE = "src/fantasyline/bettingpros_week1_2025_final.csv"  # <-- your CSV
 # ----------------------------------
 # Data loading
 # ----------------------------------
-@st.cache_data
-def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-
-    # Clean strings
-    for c in ["Player", "Team", "Pos"]:
-        if c in df.columns:
-            df[c] = df[c].astype(str).str.strip()
+# Cache caps (LRU eviction + 1h TTL keep long-running deploys at a fixed ceiling):
+#   load_data                          4 entries  (one per CSV path; shared resource, no TTL
+#                                                  so every derived cache sees the same frame)
+#   get_player_list / get_sort_columns 4 entries  (keyed by CSV path)
+#   parse_teams                        32 entries (tiny frozensets)
+#   compute_view / encode_csv          32 entries (one per recent filter state)
+CACHE_TTL = 3600
+
+COLUMNS = ["Player", "Team", "Pos", "Base_Projection", "Proj TD PTS", "Total_Projection"]
+STR_COLS = ["Player", "Team", "Pos"]
+POS_ORDER = ["RB", "WR", "TE"]
+
+# Bump whenever _parse_csv's output changes so existing sidecars are re-parsed
+SIDECAR_VERSION = 2
+SIDECAR_META_KEY = b"fantasyline"
+
+def _parse_csv(path: str) -> pd.DataFrame:
+    # Read the header first so we only ask pyarrow for columns that exist
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = set(COLUMNS) | {"Proj TD Pts"}
+    usecols = [c for c in header if c in wanted]
+    # Everything comes in as text; numerics are coerced below so junk like "-" becomes NaN
+    df = pd.read_csv(path, engine="pyarrow", usecols=usecols, dtype="string[pyarrow]", dtype_backend="pyarrow")
 
     # Normalize TD column name if needed
     if "Proj TD Pts" in df.columns and "Proj TD PTS" not in df.columns:
-        df.rename(columns={"Proj TD Pts": "Proj TD PTS"}, inplace=True)
+        df = df.rename(columns={"Proj TD Pts": "Proj TD PTS"})
+
+    # Clean strings (one vectorized pass over the string columns)
+    str_cols = [c for c in STR_COLS if c in df.columns]
+    df[str_cols] = df[str_cols].apply(lambda s: s.str.strip())
+    if "Team" in df.columns:
+        df["Team"] = df["Team"].str.upper()
 
     # Coerce numerics
     for c in ["Base_Projection", "Proj TD PTS", "Total_Projection"]:
         if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+            df[c] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+    # Low-cardinality labels -> categorical codes (smaller, faster ==/isin)
+    for c in ["Team", "Pos"]:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
 
     # Keep standard column order if present
-    cols = ["Player", "Team", "Pos", "Base_Projection", "Proj TD PTS", "Total_Projection"]
-    return df[[c for c in cols if c in df.columns]].copy()
+    df = df[[c for c in COLUMNS if c in df.columns]]
+
+    # Lowercased names for case-insensitive search without regex
+    if "Player" in df.columns:
+        df["_player_lower"] = df["Player"].str.lower()
+    return df
+
+def _expected_columns(header) -> list:
+    """Columns _parse_csv produces for a CSV with this header."""
+    names = {"Proj TD PTS" if c == "Proj TD Pts" else c for c in header}
+    cols = [c for c in COLUMNS if c in names]
+    return cols + (["_player_lower"] if "Player" in cols else [])
+
+def _sidecar_stamp(csv_path: Path) -> dict:
+    """What a sidecar must record to be trusted: parser version + exact source CSV identity."""
+    stat = csv_path.stat()
+    return {"version": SIDECAR_VERSION, "csv_mtime_ns": stat.st_mtime_ns, "csv_size": stat.st_size}
+
+def _read_sidecar(pq_path: Path, stamp: dict, columns: list):
+    """Return the sidecar frame, or None if it is missing, unreadable, stale or incomplete."""
+    if not pq_path.exists():
+        return None
+    try:
+        schema = pq.read_schema(pq_path)
+        meta = json.loads((schema.metadata or {}).get(SIDECAR_META_KEY, b"{}"))
+        if meta != stamp or not set(columns).issubset(schema.names):
+            return None
+        return pd.read_parquet(pq_path)
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+@st.cache_resource(max_entries=4)
+def load_data(path: str) -> pd.DataFrame:
+    """
+    Load the weekly projections, preferring a typed Parquet sidecar next to the CSV.
+    The sidecar is only used if its stamp matches SIDECAR_VERSION and the CSV's
+    current mtime/size; otherwise the CSV is parsed and the sidecar rewritten.
+
+    Cached as a shared resource (no per-caller copy), so callers must not mutate
+    the returned frame in place -- filter with masks/.loc to get new frames.
+    """
+    csv_path = Path(path)
+    pq_path = csv_path.with_suffix(".parquet")
+    header = pd.read_csv(path, nrows=0).columns
+    stamp = _sidecar_stamp(csv_path)
+
+    df = _read_sidecar(pq_path, stamp, _expected_columns(header))
+    if df is not None:
+        return df
+
+    df = _parse_csv(path)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = {**(table.schema.metadata or {}), SIDECAR_META_KEY: json.dumps(stamp).encode("utf-8")}
+        pq.write_table(table.replace_schema_metadata(meta), pq_path, compression="zstd")
+    except OSError:
+        # Read-only deploys just parse the CSV each cold start
+        pass
+    return df
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=4)
+def get_player_list(path: str) -> list:
+    """Sorted unique player names for the compare picker."""
+    data = load_data(path)
+    if "Player" not in data.columns:
+        return []
+    return sorted(data["Player"].dropna().unique().tolist())
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=4)
+def get_sort_columns(path: str) -> list:
+    """Columns offered in the Projections "Sort by" box, in preferred order."""
+    data = load_data(path)
+    return [c for c in ["Total_Projection", "Base_Projection", "Proj TD PTS", "Player", "Team", "Pos"] if c in data.columns]
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=32, show_spinner=False)
+def parse_teams(team_filter: str) -> frozenset:
+    """Comma-separated team codes -> upper-cased set (Team is upper-cased on load)."""
+    return frozenset(t.strip().upper() for t in team_filter.split(",") if t.strip())
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=32, show_spinner=False)
+def compute_view(path: str, quick, search: str, team_filter: str, sort_by: str, desc: bool) -> pd.DataFrame:
+    """Filtered + sorted Projections view; identical control states short-circuit."""
+    base = load_data(path)
+
+    # One combined mask, one indexing pass
+    mask = np.ones(len(base), dtype=bool)
+    if quick != "All" and "Pos" in base.columns:
+        mask &= (base["Pos"] == quick).to_numpy(dtype=bool, na_value=False)
+
+    if search and "_player_lower" in base.columns:
+        # Arrow's substring kernel over the pre-lowered names (no per-row Python dispatch)
+        hits = pc.match_substring(pa.array(base["_player_lower"]), search.lower())
+        mask &= pc.fill_null(hits, False).to_numpy(zero_copy_only=False)
+
+    if team_filter and "Team" in base.columns:
+        teams = parse_teams(team_filter)
+        if teams:
+            mask &= base["Team"].isin(teams).to_numpy(dtype=bool)
+
+    data = base.loc[mask]
+
+    # Sort the reduced frame only
+    if sort_by in data.columns:
+        data = data.sort_values(sort_by, ascending=not desc, na_position="last")
+    return data
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=32, show_spinner=False)
+def encode_csv(path: str, quick, search: str, team_filter: str, sort_by: str, desc: bool, _data: pd.DataFrame) -> bytes:
+    """
+    CSV bytes for the filtered Projections view.
+    Keyed on the filter settings only (`_data` is not hashed), so reruns with the
+    same filters reuse the bytes instead of re-serializing the frame.
+    """
+    return _data.drop(columns=["_player_lower"], errors="ignore").to_csv(index=False).encode("utf-8")
 
 df = load_data(CSV_FILE)
 
@@ -57,47 +200,23 @@ st.session_state.setdefault("compare_list", [])
 # Pages
 # ----------------------------------
 
-def set_home_background(image_filename: str = "FLlogo.png"):
-    """
-    Sets a full-page background image using base64 so it works on Streamlit Cloud.
-    Looks for the image file next to app.py.
-    """
-    app_dir = Path(__file__).resolve().parent
-    img_path = app_dir / image_filename
-    if not img_path.exists():
-        # Quietly skip if missing
-        return
-    b64 = base64.b64encode(img_path.read_bytes()).decode("utf-8")
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background: url("data:image/png;base64,{b64}") no-repeat center center fixed;
-            background-size: cover;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+CLEAR_BG_CSS = """
+<style>
+.stApp { background: var(--background-color) !important; }
+</style>
+"""
 
-def clear_background():
+def set_bg():
     """
-    Removes any custom background when not on Home.
+    Emit the plain theme-background CSS. Called once per run by the router.
+    Streamlit drops elements a rerun doesn't re-emit, so this can't be skipped
+    on later reruns; the CSS itself is tiny.
     """
-    st.markdown(
-        """
-        <style>
-        .stApp { background: var(--background-color) !important; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(CLEAR_BG_CSS, unsafe_allow_html=True)
 
 def page_home():
-    clear_background()  # keep background plain
-
-    # Encode your logo
-    logo_data = get_base64_image("FLlogo.png")  # logo file next to app.py
+    # Logo is served from static/ next to app.py
+    logo_url = static_url("FLlogo.png")
 
     st.markdown(
         f"""
@@ -107,7 +226,7 @@ def page_home():
                 Weekly projections for <b>RB / WR / TE</b> from your CSV.<br/>
                 Filter, sort, and compare up to five players.
             </p>
-            <img src="{logo_data}" width="300" style="margin-top:20px;"/>
+            <img src="{logo_url}" width="300" style="margin-top:20px;"/>
         </div>
         """,
         unsafe_allow_html=True,
@@ -118,13 +237,24 @@ def page_home():
 
    
 
+# Projections table display; the search helper column is hidden rather than dropped
+TABLE_COLUMN_CONFIG = {
+    "_player_lower": None,
+    "Base_Projection": st.column_config.NumberColumn(format="%.2f"),
+    "Proj TD PTS": st.column_config.NumberColumn(format="%.2f"),
+    "Total_Projection": st.column_config.NumberColumn(format="%.2f"),
+}
+
 def page_projections():
     st.markdown("## Projections")
     st.caption("All positions by default. Use quick filters for RB / WR / TE, search, and sort.")
 
     # ---- Controls
     with st.container():
-        quick = st.segmented_control("Quick position filter", options=["All", "RB", "WR", "TE"], default="All")
+        # Preferred order first, then any other positions present in the CSV
+        cats = df["Pos"].cat.categories.tolist() if "Pos" in df.columns else []
+        positions = [p for p in POS_ORDER if p in cats] + [p for p in cats if p not in POS_ORDER]
+        quick = st.segmented_control("Quick position filter", options=["All", *positions], default="All")
         col_a, col_b, col_c, col_d = st.columns([2,2,2,2])
         with col_a:
             search = st.text_input("Search Player", "")
@@ -133,58 +263,91 @@ def page_projections():
         with col_c:
             sort_by = st.selectbox(
                 "Sort by",
-                [c for c in ["Total_Projection", "Base_Projection", "Proj TD PTS", "Player", "Team", "Pos"] if c in df.columns],
+                get_sort_columns(CSV_FILE),
                 index=0
             )
         with col_d:
             desc = st.toggle("Sort descending", value=True)
 
-    # ---- Filtering
-    data = df.copy()
-    if quick != "All" and "Pos" in data.columns:
-        data = data[data["Pos"] == quick]
-
-    if search and "Player" in data.columns:
-        data = data[data["Player"].str.contains(search, case=False, na=False)]
+    # ---- Filtering + sorting (memoized on the control values)
+    data = compute_view(CSV_FILE, quick, search, team_filter, sort_by, desc)
 
-    if team_filter and "Team" in data.columns:
-        teams = [t.strip() for t in team_filter.split(",") if t.strip()]
-        if teams:
-            data = data[data["Team"].isin(teams)]
-
-    # ---- Sorting
-    if sort_by in data.columns:
-        data = data.sort_values(sort_by, ascending=not desc, na_position="last")
-
-    # ---- Pagination
-    page_size = st.selectbox("Rows per page", [10, 25, 50, 100], index=1)
     total_rows = len(data)
     if total_rows == 0:
         st.info("No rows to display with current filters.")
         return
-    max_page = (total_rows - 1) // page_size + 1
-    page = st.number_input("Page", min_value=1, max_value=max_page, value=1)
-    start, end = (page - 1) * page_size, (page - 1) * page_size + page_size
 
-    # ---- Table
-    st.write(f"Showing **{min(end, total_rows)}** of **{total_rows}** rows")
-    st.dataframe(data.iloc[start:end], use_container_width=True, hide_index=True)
+    # ---- Table (st.dataframe virtualizes scrolling, so no Python-side paging)
+    st.write(f"Showing **{total_rows}** rows")
+    st.dataframe(
+        data,
+        use_container_width=True,
+        hide_index=True,
+        height=600,
+        column_config=TABLE_COLUMN_CONFIG,
+    )
 
     # ---- Download current view
     st.download_button(
         "Download filtered CSV",
-        data=data.to_csv(index=False).encode("utf-8"),
+        data=encode_csv(CSV_FILE, quick, search, team_filter, sort_by, desc, data),
         file_name="fantasyline_filtered.csv",
         mime="text/csv"
     )
 
+# Compare card markup; kept flush-left with no blank lines so markdown treats it as one HTML block
+CARD_TEMPLATE = """<div style="
+flex:1 1 0; min-width:180px;
+background: var(--secondary-background-color);
+border: 1px solid rgba(255,255,255,0.08);
+border-radius: 16px; padding: 16px 18px;
+box-shadow: 0 1px 12px rgba(0,0,0,0.15);
+">
+<h4 style="margin:0 0 6px 0;">{player}{crown}</h4>
+<div style="opacity:.8; margin:-4px 0 8px">{team} • {pos}</div>
+<div style="display:flex; gap:12px;">
+<div>
+<div style="font-size:12px;opacity:.7">Total</div>
+<div style="font-size:22px;font-weight:700">{total}</div>
+</div>
+<div>
+<div style="font-size:12px;opacity:.7">Base</div>
+<div style="font-size:22px;font-weight:700">{base}</div>
+</div>
+<div>
+<div style="font-size:12px;opacity:.7">TD</div>
+<div style="font-size:22px;font-weight:700">{td}</div>
+</div>
+</div>
+</div>"""
+
+def _num_col(frame: pd.DataFrame, col: str) -> np.ndarray:
+    """Numeric column as a raw float ndarray (NaN where missing, all-NaN if absent)."""
+    if col not in frame.columns:
+        return np.full(len(frame), np.nan)
+    return frame[col].to_numpy(dtype=float, na_value=np.nan)
+
+def _text_col(frame: pd.DataFrame, col: str) -> np.ndarray:
+    """Text column as a raw object ndarray (None if absent)."""
+    if col not in frame.columns:
+        return np.full(len(frame), None, dtype=object)
+    return frame[col].to_numpy(dtype=object)
+
+def _fmt_points(values: np.ndarray) -> np.ndarray:
+    """Format floats as 2-decimal strings, '—' where missing."""
+    return np.where(np.isnan(values), "—", np.char.mod("%.2f", values))
+
+def _fmt_labels(values: np.ndarray) -> np.ndarray:
+    """Labels as strings, '—' where missing."""
+    return np.where(pd.isna(values), "—", values.astype(str))
+
 def page_compare():
     import numpy as np
     st.markdown("## Compare Players")
     st.caption("Pick up to 5 players. We’ll highlight who has the highest **Total_Projection**.")
 
     # Build a base list of players
-    player_list = df["Player"].dropna().unique().tolist() if "Player" in df.columns else []
+    player_list = get_player_list(CSV_FILE)
 
     # Let Streamlit manage widget state (no session_state needed)
     picks = st.multiselect(
@@ -202,65 +365,46 @@ def page_compare():
         st.info("Select players above to compare.")
         return
 
-    sub = df[df["Player"].isin(picks)].copy()
+    sub = df[df["Player"].isin(picks)]
 
     # Guard: if Total_Projection missing
     if "Total_Projection" not in sub.columns:
         st.error("Column `Total_Projection` not found in CSV — cannot rank players.")
-        st.dataframe(sub, use_container_width=True, hide_index=True)
+        st.dataframe(sub.drop(columns=["_player_lower"], errors="ignore"), use_container_width=True, hide_index=True)
         return
 
-    # Determine the top player(s)
-    sub["TP_sanitized"] = pd.to_numeric(sub["Total_Projection"], errors="coerce")
-    top_tp = sub["TP_sanitized"].max()
-    top_rows = sub.loc[sub["TP_sanitized"] == top_tp]
+    # Rank once on the raw values (NaN last); ties for the top fall out of one compare
+    tp = _num_col(sub, "Total_Projection")
+    players = _text_col(sub, "Player")
+    order = np.argsort(-np.nan_to_num(tp, nan=-np.inf), kind="stable")
+    top_tp = tp[order[0]] if len(order) else np.nan
+    top_names = players[tp == top_tp]
 
     if pd.notna(top_tp):
-        if len(top_rows) == 1:
-            st.success(f"**{top_rows.iloc[0]['Player']}** has the highest projection ({top_tp:.2f}).")
+        if len(top_names) == 1:
+            st.success(f"**{top_names[0]}** has the highest projection ({top_tp:.2f}).")
         else:
             # Handle ties
-            names = ", ".join(top_rows["Player"].tolist())
+            names = ", ".join(top_names)
             st.info(f"Tie for highest projection ({top_tp:.2f}) between: **{names}**")
 
-    # Show comparison cards (with a crown on the top player)
-    cols = st.columns(min(5, len(sub)))
-    ranked = sub.sort_values("TP_sanitized", ascending=False).reset_index(drop=True)
-    for i, (_, r) in enumerate(ranked.iterrows()):
-        is_top = (i == 0 and pd.notna(r["TP_sanitized"]))
-        crown = " 👑" if is_top else ""
-        with cols[i % len(cols)]:
-            st.markdown(f"""
-            <div style="
-              background: var(--secondary-background-color);
-              border: 1px solid rgba(255,255,255,0.08);
-              border-radius: 16px; padding: 16px 18px;
-              box-shadow: 0 1px 12px rgba(0,0,0,0.15);
-            ">
-              <h4 style="margin:0 0 6px 0;">{r.get('Player','—')}{crown}</h4>
-              <div style="opacity:.8; margin:-4px 0 8px">{r.get('Team','—')} • {r.get('Pos','—')}</div>
-              <div style="display:flex; gap:12px;">
-                <div>
-                  <div style="font-size:12px;opacity:.7">Total</div>
-                  <div style="font-size:22px;font-weight:700">
-                    {'—' if pd.isna(r.get('Total_Projection')) else f"{r.get('Total_Projection'):.2f}"}
-                  </div>
-                </div>
-                <div>
-                  <div style="font-size:12px;opacity:.7">Base</div>
-                  <div style="font-size:22px;font-weight:700">
-                    {'—' if pd.isna(r.get('Base_Projection')) else f"{r.get('Base_Projection'):.2f}"}
-                  </div>
-                </div>
-                <div>
-                  <div style="font-size:12px;opacity:.7">TD</div>
-                  <div style="font-size:22px;font-weight:700">
-                    {'—' if pd.isna(r.get('Proj TD PTS')) else f"{r.get('Proj TD PTS'):.2f}"}
-                  </div>
-                </div>
-              </div>
-            </div>
-            """, unsafe_allow_html=True)
+    # Show comparison cards (with a crown on the top player) in one markdown write
+    crowns = np.where((np.arange(len(order)) == 0) & ~np.isnan(tp[order]), " 👑", "")
+    cards = [
+        CARD_TEMPLATE.format(player=p, crown=c, team=t, pos=ps, total=tot, base=bs, td=td)
+        for p, c, t, ps, tot, bs, td in zip(
+            _fmt_labels(players[order]), crowns,
+            _fmt_labels(_text_col(sub, "Team")[order]),
+            _fmt_labels(_text_col(sub, "Pos")[order]),
+            _fmt_points(tp[order]),
+            _fmt_points(_num_col(sub, "Base_Projection")[order]),
+            _fmt_points(_num_col(sub, "Proj TD PTS")[order]),
+        )
+    ]
+    st.markdown(
+        f'<div style="display:flex; gap:12px; flex-wrap:wrap;">{"".join(cards)}</div>',
+        unsafe_allow_html=True,
+    )
 
     # Download the compare subset
     dl_cols = [c for c in ["Player","Team","Pos","Base_Projection","Proj TD PTS","Total_Projection"] if c in sub.columns]
@@ -280,12 +424,12 @@ with st.sidebar:
     page = st.radio("Navigate", ["Home", "Projections", "Compare"], index=0)
     st.caption("CSV: bettingpros_week1_2025_final.csv")
 
+set_bg()  # every page, Home included, uses the plain theme background
+
 if page == "Home":
     page_home()
 elif page == "Projections":
-    clear_background()
     page_projections()
 else:
-    clear_background()
     page_compare()
 